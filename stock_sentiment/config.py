@@ -1,15 +1,23 @@
 """
 Configuration file for stock sentiment analysis project
 """
+import functools
 import os
 from dotenv import load_dotenv
 
+
+@functools.lru_cache(maxsize=1)
+def _load_env() -> bool:
+    """Parse the .env file once per process"""
+    return load_dotenv()
+
+
 # Load environment variables
-load_dotenv()
+_load_env()
 
-# API Keys
-POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
-WAVESPEED_API_KEY = os.getenv("WAVESPEED_API_KEY")
+# API Keys (bound once at import; later lookups are plain attribute access)
+POLYGON_API_KEY = os.environ.get("POLYGON_API_KEY")
+WAVESPEED_API_KEY = os.environ.get("WAVESPEED_API_KEY")
 
 # Polygon API config
 POLYGON_BASE_URL = "https://api.polygon.io"
@@ -17,13 +25,40 @@ POLYGON_BASE_URL = "https://api.polygon.io"
 # News fetching config
 DEFAULT_NEWS_LIMIT = 20  # Default number of news articles per stock
 NEWS_LOOKBACK_DAYS = 7   # Fetch news from the past N days
+NEWS_CACHE_TTL = 900     # Reuse fetched news for N seconds (same ticker/dates/limit)
+NEWS_CACHE_MAXSIZE = 256 # Max cached news queries
 
 # Concurrency config
-MAX_CONCURRENT_LLM_CALLS = 5  # Max parallel LLM API calls
+MAX_CONCURRENT_LLM_CALLS = 16 # Max parallel LLM API calls (shared across all stocks)
+MAX_CONCURRENT_STOCKS = 8     # Max stocks analyzed in parallel (-a mode)
+MAX_LLM_REQUESTS_PER_MINUTE = 120  # LLM request rate limit (0 = unlimited)
+ITEMS_PER_REQUEST = 5         # News articles packed into one LLM request (1 = no packing)
+
+# HTTP connection pooling / retry config
+HTTP_POOL_CONNECTIONS = 16  # Number of host connection pools to cache
+# Max keep-alive connections per host; sized so every concurrent worker
+# (LLM calls to WaveSpeed, stock workers to Polygon) reuses a connection
+HTTP_POOL_MAXSIZE = max(MAX_CONCURRENT_LLM_CALLS, MAX_CONCURRENT_STOCKS)
+HTTP_MAX_RETRIES = 3        # Retries on connection errors and 429/5xx
+HTTP_BACKOFF_FACTOR = 0.3   # Exponential backoff between retries (seconds)
 
 # WaveSpeed LLM API config
 WAVESPEED_API_URL = "https://api.wavespeed.ai/api/v3/wavespeed-ai/any-llm"
 LLM_MODEL = "anthropic/claude-3.7-sonnet"
+LLM_MAX_TOKENS_PER_ITEM = 80  # Output token cap per analyzed article (one JSON object)
+LLM_MAX_ATTEMPTS = 3      # Attempts per LLM call when the API reports an error
+LLM_RETRY_BASE_WAIT = 1   # Base backoff between attempts (seconds, doubles each retry)
+LLM_RETRY_MAX_WAIT = 30   # Max backoff between attempts (seconds)
+
+# Local classifier fast path: articles whose headline VADER compound score
+# is at least this far from 0 (range 0-1) are scored locally without an LLM call
+LOCAL_CLASSIFIER_THRESHOLD = 0.6
+LOCAL_CLASSIFIER_MAX_CONFIDENCE = 50  # Cap on the confidence (aggregation weight) of VADER results
+ROUTINE_NEWS_CONFIDENCE = 30  # Confidence given to routine announcements scored neutral locally
+
+# LLM result cache config (identical articles are not re-analyzed)
+LLM_CACHE_DIR = os.path.expanduser("~/.cache/stock_sentiment/llm")
+LLM_CACHE_EXPIRE = 7 * 86400  # Cached results expire after N seconds (7 days)
 
 # Target stock list (tech sector)
 TECH_STOCKS = [
@@ -39,20 +74,53 @@ TECH_STOCKS = [
     "CRM",    # Salesforce
 ]
 
-# Sentiment analysis prompt template
-SENTIMENT_PROMPT = """You are a professional financial analyst. Analyze the following news about {ticker} stock and provide a sentiment score.
+# Sentiment analysis prompt templates
+# The static instructions come first and are byte-identical across every
+# request (single and packed), so the provider can reuse its prompt-prefix
+# cache; only the article fields at the tail vary. The builders are
+# f-strings, compiled once into bytecode instead of re-parsed by
+# str.format() for every article.
+SENTIMENT_INSTRUCTIONS = """You are a professional financial analyst. Analyze news about a stock and provide a sentiment score.
+
+Rules:
+- sentiment: must be "bullish", "neutral", or "bearish"
+- score: integer 0-100 (50=neutral, 100=extremely bullish, 0=extremely bearish)
+- confidence: integer 0-100 (your confidence level)
+- reason: brief explanation in 15 words or fewer
+- Return ONLY the requested JSON, nothing else
+"""
+
 
+def build_sentiment_prompt(ticker: str, title: str, description: str, published_date: str) -> str:
+    """Build the sentiment analysis prompt for a single news article"""
+    return f"""{SENTIMENT_INSTRUCTIONS}
+Return ONLY valid JSON in this exact format (no other text, no markdown):
+{{"sentiment": "bullish", "score": 75, "confidence": 80, "reason": "brief explanation"}}
+
+Stock: {ticker}
 News Title: {title}
 News Summary: {description}
 Published: {published_date}
+"""
 
-Return ONLY valid JSON in this exact format (no other text, no markdown):
-{{"sentiment": "bullish", "score": 75, "confidence": 80, "reason": "brief explanation"}}
 
-Rules:
-- sentiment: must be "bullish", "neutral", or "bearish"
-- score: integer 0-100 (50=neutral, 100=extremely bullish, 0=extremely bearish)
-- confidence: integer 0-100 (your confidence level)
-- reason: brief explanation in under 30 words
-- Return ONLY the JSON object, nothing else
+# Packed prompt template: several articles analyzed in one LLM request
+def build_batch_sentiment_prompt(news_list: list) -> str:
+    """Build one sentiment prompt covering several news articles"""
+    articles = "\n\n".join(
+        f"""Article {i}
+Stock: {news.get("ticker", "Unknown")}
+News Title: {news.get("title", "")}
+News Summary: {news.get("description", "")}
+Published: {news.get("published_utc", "")}"""
+        for i, news in enumerate(news_list, 1)
+    )
+
+    return f"""{SENTIMENT_INSTRUCTIONS}
+Return ONLY a valid JSON array with one object per news item, each tagged with its article number (no other text, no markdown):
+[{{"article": 1, "sentiment": "bullish", "score": 75, "confidence": 80, "reason": "brief explanation"}}]
+
+News items ({len(news_list)}):
+
+{articles}
 """
@@ -0,0 +1,36 @@
+"""
+HTTP session factory - Shared connection pooling and retries for API calls
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import config
+
+
+def create_session() -> requests.Session:
+    """
+    Create a requests Session with keep-alive connection pooling and
+    automatic retries on transient errors (429 / 5xx).
+
+    Sessions are safe to share across threads for independent requests.
+
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=config.HTTP_MAX_RETRIES,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,  # Let raise_for_status() report the final response
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=config.HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -2,19 +2,51 @@
 Main entry point - Stock Sentiment Analysis System
 """
 import argparse
-import json
+import logging
+import operator
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Dict
+import orjson
 import pandas as pd
 
 from news_fetcher import NewsFetcher
 from sentiment_analyzer import SentimentAnalyzer
+from http_session import create_session
 import config
 
+logger = logging.getLogger(__name__)
+
 # Results directory
 RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
 
+# Summary table columns and their dtypes
+_SUMMARY_COLUMNS = ["ticker", "score", "sentiment", "news_count", "avg_confidence", "bullish", "bearish", "neutral"]
+_SUMMARY_DTYPES = {
+    "score": "float32",
+    "news_count": "int16",
+    "avg_confidence": "float32",
+    "bullish": "int16",
+    "bearish": "int16",
+    "neutral": "int16",
+}
+
+# Sentiment labels used when printing results
+_SENTIMENT_TAG = {"bullish": "[+]", "neutral": "[=]", "bearish": "[-]"}
+_SENTIMENT_DISPLAY = {"bullish": "BULLISH", "neutral": "NEUTRAL", "bearish": "BEARISH"}
+
+
+def setup_logging():
+    """Send progress logs straight to stdout, so each line shows up as soon as it is logged"""
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(console)
+
 
 def ensure_results_dir():
     """Create results directory if it doesn't exist"""
@@ -25,92 +57,143 @@ class StockSentimentSystem:
     """Stock Sentiment Analysis System"""
 
     def __init__(self):
-        self.news_fetcher = NewsFetcher()
-        self.sentiment_analyzer = SentimentAnalyzer()
+        # One pooled HTTP session shared by the Polygon and WaveSpeed clients
+        self.session = create_session()
+        self.news_fetcher = NewsFetcher(session=self.session)
+        self.sentiment_analyzer = SentimentAnalyzer(session=self.session)
 
-    def analyze_stock(self, ticker: str, news_limit: int = 20) -> Dict:
+    def analyze_stock(
+        self,
+        ticker: str,
+        news_limit: int = 20,
+        analysis_time: str = None,
+        include_details: bool = True
+    ) -> Dict:
         """
         Analyze sentiment for a single stock.
 
         Args:
             ticker: Stock ticker symbol
             news_limit: Number of news articles to fetch
+            analysis_time: ISO timestamp to record, defaults to now
+            include_details: Keep per-article results under "details"
+                (used by print_result and the saved JSON)
 
         Returns:
             Complete analysis result
         """
-        print(f"\n{'='*60}")
-        print(f"Analyzing: {ticker}")
-        print(f"{'='*60}")
+        analysis_time = analysis_time or datetime.now().isoformat()
 
         # 1. Fetch news
-        print(f"\n[1/2] Fetching news (last {config.NEWS_LOOKBACK_DAYS} days, limit {news_limit})...")
+        logger.info(
+            f"\n{'='*60}\n"
+            f"Analyzing: {ticker}\n"
+            f"{'='*60}\n"
+            f"\n[1/2] Fetching news (last {config.NEWS_LOOKBACK_DAYS} days, limit {news_limit})..."
+        )
         news_list = self.news_fetcher.get_news(ticker, limit=news_limit)
 
         if not news_list:
-            print(f"Warning: No news found for {ticker}")
+            logger.warning(f"Warning: No news found for {ticker}")
             return {
                 "ticker": ticker,
-                "analysis_time": datetime.now().isoformat(),
+                "analysis_time": analysis_time,
                 "final_score": 50,
                 "sentiment": "neutral",
                 "news_count": 0,
                 "message": "No news found"
             }
 
-        print(f"  Found {len(news_list)} articles")
-
         # 2. Analyze sentiment
-        print(f"\n[2/2] Analyzing sentiment...")
+        logger.info(f"  [{ticker}] Found {len(news_list)} articles\n\n[2/2] Analyzing sentiment for {ticker}...")
         analysis_results = self.sentiment_analyzer.analyze_news_batch(news_list)
 
         # 3. Aggregate results
-        aggregated = self.sentiment_analyzer.aggregate_sentiment(analysis_results)
+        aggregated = self.sentiment_analyzer.aggregate_sentiment(analysis_results, include_details=include_details)
 
         result = {
             "ticker": ticker,
-            "analysis_time": datetime.now().isoformat(),
+            "analysis_time": analysis_time,
             "lookback_days": config.NEWS_LOOKBACK_DAYS,
             **aggregated
         }
 
         return result
 
+    def _analyze_for_df(self, ticker: str, news_limit: int, analysis_time: str = None) -> Dict:
+        """
+        Analyze a single stock and flatten it into a summary row.
+
+        Args:
+            ticker: Stock ticker symbol
+            news_limit: Number of news articles to fetch
+            analysis_time: ISO timestamp shared by the whole run
+
+        Returns:
+            Dict with the full result under "result" and the summary row under "row"
+        """
+        result = self.analyze_stock(ticker, news_limit, analysis_time)
+        row = {
+            "ticker": result["ticker"],
+            "score": result["final_score"],
+            "sentiment": result["sentiment"],
+            "news_count": result["news_count"],
+            "avg_confidence": result.get("avg_confidence", 0),
+            "bullish": result.get("bullish_count", 0),
+            "bearish": result.get("bearish_count", 0),
+            "neutral": result.get("neutral_count", 0),
+        }
+        return {"result": result, "row": row}
+
+    @staticmethod
+    def _format_row(row: Dict) -> str:
+        """Format a summary row as a single line"""
+        sentiment_display = _SENTIMENT_DISPLAY.get(row["sentiment"], "UNKNOWN")
+        return (f"{row['ticker']:<8} Score: {row['score']:<6.1f} {sentiment_display:<8} "
+                f"Articles: {row['news_count']:<4} Confidence: {row['avg_confidence']:.1f}%")
+
     def analyze_multiple_stocks(
         self,
         tickers: List[str] = None,
-        news_limit: int = 20
+        news_limit: int = 20,
+        max_workers: int = None
     ) -> pd.DataFrame:
         """
-        Analyze multiple stocks.
+        Analyze multiple stocks concurrently.
 
         Args:
             tickers: List of tickers, defaults to config.TECH_STOCKS
             news_limit: Number of news articles per stock
+            max_workers: Max stocks analyzed in parallel, defaults to
+                config.MAX_CONCURRENT_STOCKS (bounds Polygon request rate)
 
         Returns:
             DataFrame with all analysis results
         """
         tickers = tickers or config.TECH_STOCKS
-        all_results = []
-        rows = []
-
-        for ticker in tickers:
-            result = self.analyze_stock(ticker, news_limit)
-            all_results.append(result)
-            rows.append({
-                "ticker": result["ticker"],
-                "score": result["final_score"],
-                "sentiment": result["sentiment"],
-                "news_count": result["news_count"],
-                "avg_confidence": result.get("avg_confidence", 0),
-                "bullish": result.get("bullish_count", 0),
-                "bearish": result.get("bearish_count", 0),
-                "neutral": result.get("neutral_count", 0),
-            })
-
-        df = pd.DataFrame(rows)
-        df = df.sort_values("score", ascending=False).reset_index(drop=True)
+        max_workers = max_workers or config.MAX_CONCURRENT_STOCKS
+        outputs = [None] * len(tickers)
+        run_ts = datetime.now().isoformat()  # One timestamp for the whole run
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as executor:
+            future_to_idx = {
+                executor.submit(self._analyze_for_df, ticker, news_limit, run_ts): i
+                for i, ticker in enumerate(tickers)
+            }
+
+            # Report each stock's summary row as soon as it finishes
+            for done, future in enumerate(as_completed(future_to_idx), 1):
+                output = future.result()
+                outputs[future_to_idx[future]] = output
+                logger.info(f"\n[{done}/{len(tickers)} stocks done] {self._format_row(output['row'])}")
+
+        # Keep results in the original ticker order
+        all_results = [output["result"] for output in outputs]
+        rows = [output["row"] for output in outputs]
+
+        # Sort rows before building the DataFrame (avoids sort + reindex copies)
+        rows.sort(key=operator.itemgetter("score"), reverse=True)
+        df = pd.DataFrame.from_records(rows, columns=_SUMMARY_COLUMNS).astype(_SUMMARY_DTYPES)
 
         # Save results
         self.save_results(all_results, df)
@@ -130,15 +213,14 @@ class StockSentimentSystem:
 
         # Save detailed JSON
         json_path = os.path.join(RESULTS_DIR, f"analysis_{timestamp}.json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(full_results, f, indent=2, ensure_ascii=False)
+        with open(json_path, "wb") as f:
+            f.write(orjson.dumps(full_results, option=orjson.OPT_INDENT_2))
 
         # Save summary CSV
         csv_path = os.path.join(RESULTS_DIR, f"summary_{timestamp}.csv")
         summary_df.to_csv(csv_path, index=False)
 
-        print(f"\n[Saved] Detailed results -> {json_path}")
-        print(f"[Saved] Summary CSV     -> {csv_path}")
+        logger.info(f"\n[Saved] Detailed results -> {json_path}\n[Saved] Summary CSV     -> {csv_path}")
 
     def save_single_result(self, result: Dict):
         """Save a single stock analysis result"""
@@ -147,10 +229,10 @@ class StockSentimentSystem:
         ticker = result.get("ticker", "UNKNOWN")
 
         json_path = os.path.join(RESULTS_DIR, f"{ticker}_{timestamp}.json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        with open(json_path, "wb") as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
 
-        print(f"\n[Saved] {ticker} result -> {json_path}")
+        logger.info(f"\n[Saved] {ticker} result -> {json_path}")
 
     def print_result(self, result: Dict):
         """Print analysis result for a single stock"""
@@ -167,11 +249,7 @@ class StockSentimentSystem:
         if "details" in result and result["details"]:
             print(f"\n--- Article Details ---")
             for i, detail in enumerate(result["details"], 1):
-                sentiment_tag = {
-                    "bullish": "[+]",
-                    "neutral": "[=]",
-                    "bearish": "[-]"
-                }.get(detail.get("sentiment", "neutral"), "[?]")
+                sentiment_tag = _SENTIMENT_TAG.get(detail.get("sentiment", "neutral"), "[?]")
 
                 title = detail.get('title', 'N/A')[:60]
                 print(f"\n{i}. {sentiment_tag} [Score:{detail.get('score', 50)}] {title}")
@@ -192,11 +270,7 @@ class StockSentimentSystem:
         print("-" * 70)
 
         for i, row in df.iterrows():
-            sentiment_display = {
-                "bullish": "BULLISH",
-                "neutral": "NEUTRAL",
-                "bearish": "BEARISH"
-            }.get(row["sentiment"], "UNKNOWN")
+            sentiment_display = _SENTIMENT_DISPLAY.get(row["sentiment"], "UNKNOWN")
 
             print(f"{i+1:<6} {row['ticker']:<8} {row['score']:<8.1f} {sentiment_display:<12} {row['news_count']:<10} {row['avg_confidence']:<10.1f}")
 
@@ -235,6 +309,7 @@ def main():
 
     args = parser.parse_args()
 
+    setup_logging()
     system = StockSentimentSystem()
 
     if args.ticker:
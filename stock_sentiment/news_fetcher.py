@@ -1,18 +1,31 @@
 """
 新闻获取模块 - 从Polygon.io获取股票相关新闻
 """
+import logging
+import threading
+import time
+import orjson
 import requests
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
 import config
+from http_session import create_session
+
+logger = logging.getLogger(__name__)
 
 
 class NewsFetcher:
     """从Polygon.io获取股票新闻"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, session: requests.Session = None):
         self.api_key = api_key or config.POLYGON_API_KEY
         self.base_url = config.POLYGON_BASE_URL
+        self.session = session or create_session()
+        
+        # 新闻缓存: (ticker, start, end, limit) -> (写入时间, 新闻元组)
+        self._cache: Dict[tuple, tuple] = {}
+        self._cache_lock = threading.Lock()
         
         if not self.api_key:
             raise ValueError("Polygon API key is required. Please set POLYGON_API_KEY in .env file.")
@@ -37,16 +50,24 @@ class NewsFetcher:
         limit = limit or config.DEFAULT_NEWS_LIMIT
         days_back = days_back or config.NEWS_LOOKBACK_DAYS
         
-        # 计算日期范围
-        end_date = datetime.now()
+        # 计算日期范围 (Polygon按published_utc过滤，使用UTC日期)
+        end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days_back)
+        start_str = start_date.strftime("%Y-%m-%d")
+        end_str = end_date.strftime("%Y-%m-%d")
+        
+        # 命中缓存则直接返回，避免重复请求Polygon
+        cache_key = (ticker, start_str, end_str, limit)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return [dict(news) for news in cached]
         
         # 构建API请求
         url = f"{self.base_url}/v2/reference/news"
         params = {
             "ticker": ticker,
-            "published_utc.gte": start_date.strftime("%Y-%m-%d"),
-            "published_utc.lte": end_date.strftime("%Y-%m-%d"),
+            "published_utc.gte": start_str,
+            "published_utc.lte": end_str,
             "limit": limit,
             "sort": "published_utc",
             "order": "desc",
@@ -54,21 +75,42 @@ class NewsFetcher:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if data.get("status") == "OK" or "results" in data:
                 news_list = data.get("results", [])
-                return self._process_news(news_list, ticker)
+                processed = self._process_news(news_list, ticker)
+                self._set_cached(cache_key, processed)
+                return processed
             else:
-                print(f"API返回异常: {data}")
+                logger.warning(f"API返回异常: {data}")
                 return []
                 
-        except requests.exceptions.RequestException as e:
-            print(f"获取新闻失败: {e}")
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.warning(f"获取新闻失败: {e}")
             return []
     
+    def _get_cached(self, key: tuple) -> Optional[tuple]:
+        """读取未过期的缓存新闻，未命中返回None"""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, news = entry
+            if time.monotonic() - stored_at > config.NEWS_CACHE_TTL:
+                del self._cache[key]
+                return None
+            return news
+    
+    def _set_cached(self, key: tuple, news_list: List[Dict]):
+        """写入缓存，超过上限时淘汰最早的条目"""
+        with self._cache_lock:
+            if key not in self._cache and len(self._cache) >= config.NEWS_CACHE_MAXSIZE:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = (time.monotonic(), tuple(dict(news) for news in news_list))
+    
     def _process_news(self, news_list: List[Dict], ticker: str) -> List[Dict]:
         """处理和清洗新闻数据"""
         processed = []
@@ -106,19 +148,24 @@ class NewsFetcher:
             字典，key为股票代码，value为新闻列表
         """
         tickers = tickers or config.TECH_STOCKS
-        all_news = {}
         
-        for ticker in tickers:
-            print(f"正在获取 {ticker} 的新闻...")
+        def fetch(ticker: str) -> List[Dict]:
             news = self.get_news(ticker, limit=limit_per_stock)
-            all_news[ticker] = news
-            print(f"  获取到 {len(news)} 条新闻")
+            logger.info(f"  {ticker}: 获取到 {len(news)} 条新闻")
+            return news
+        
+        # 并发请求Polygon（共享同一个连接池Session）
+        logger.info(f"正在并发获取 {len(tickers)} 只股票的新闻...")
+        with ThreadPoolExecutor(max_workers=min(len(tickers), config.MAX_CONCURRENT_STOCKS)) as executor:
+            all_news = dict(zip(tickers, executor.map(fetch, tickers)))
         
         return all_news
 
 
 # 测试代码
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     fetcher = NewsFetcher()
     
     # 测试获取单只股票新闻